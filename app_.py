@@ -1,116 +1,11 @@
 import streamlit as st
 import pandas as pd
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
-import pytesseract
+from PIL import Image
 import io
-import re
-import numpy as np
+from img2tab import PRESETS, extract_table, preprocess_image
 
 st.set_page_config(page_title="Table Screenshot to Excel/CSV", page_icon="📊", layout="wide")
 
-def preprocess_image(image, contrast=1.0, sharpness=1.0, brightness=1.0, denoise=False, binarize=False, threshold=128):
-    """
-    Preprocess image to improve OCR accuracy with adjustable levels
-    
-    Args:
-        image: PIL Image object
-        contrast: Contrast level (1.0 = original, >1.0 = more contrast)
-        sharpness: Sharpness level (1.0 = original, >1.0 = sharper)
-        brightness: Brightness level (1.0 = original, >1.0 = brighter)
-        denoise: Boolean to apply noise reduction
-        binarize: Boolean to convert to black & white
-        threshold: Threshold for binarization (0-255)
-    """
-    processed = image.copy()
-    
-    # Convert to RGB if needed
-    if processed.mode != 'L' and processed.mode != 'RGB':
-        processed = processed.convert('RGB')
-    
-    # Denoise first (if enabled)
-    if denoise:
-        processed = processed.filter(ImageFilter.MedianFilter(size=3))
-    
-    # Adjust brightness
-    if brightness != 1.0:
-        enhancer = ImageEnhance.Brightness(processed)
-        processed = enhancer.enhance(brightness)
-    
-    # Enhance contrast
-    if contrast != 1.0:
-        enhancer = ImageEnhance.Contrast(processed)
-        processed = enhancer.enhance(contrast)
-    
-    # Enhance sharpness
-    if sharpness != 1.0:
-        enhancer = ImageEnhance.Sharpness(processed)
-        processed = enhancer.enhance(sharpness)
-    
-    # Apply additional edge enhancement for high sharpness
-    if sharpness > 2.0:
-        processed = processed.filter(ImageFilter.EDGE_ENHANCE)
-    
-    # Binarize (convert to pure black and white)
-    if binarize:
-        processed = processed.convert('L')
-        processed = ImageOps.autocontrast(processed)
-        processed = processed.point(lambda p: 255 if p > threshold else 0)
-    
-    return processed
-
-def parse_table_data(extracted_text, expected_columns=None):
-    """
-    Parse extracted text into table data with optional column hint
-    """
-    lines = extracted_text.strip().split('\n')
-    lines = [line.strip() for line in lines if line.strip()]
-    
-    table_data = []
-    
-    if expected_columns:
-        # Use column count hint for better parsing
-        for line in lines:
-            # Try multiple splitting strategies
-            # Strategy 1: Split by multiple spaces or tabs
-            row = re.split(r'\s{2,}|\t+', line)
-            row = [cell.strip() for cell in row if cell.strip()]
-            
-            # Strategy 2: If we don't have expected columns, try single space split
-            if len(row) != expected_columns:
-                row = line.split()
-                row = [cell.strip() for cell in row if cell.strip()]
-            
-            # Strategy 3: Try to intelligently group tokens
-            if len(row) > expected_columns:
-                # Too many columns - try to merge adjacent tokens
-                new_row = []
-                i = 0
-                while i < len(row) and len(new_row) < expected_columns:
-                    if len(new_row) == expected_columns - 1:
-                        # Last column - join remaining
-                        new_row.append(' '.join(row[i:]))
-                        break
-                    else:
-                        new_row.append(row[i])
-                        i += 1
-                row = new_row
-            elif len(row) < expected_columns and len(row) > 0:
-                # Too few columns - pad with empty strings
-                while len(row) < expected_columns:
-                    row.append('')
-            
-            if row and len(row) == expected_columns:
-                table_data.append(row)
-    else:
-        # Original parsing method without column hint
-        for line in lines:
-            row = re.split(r'\s{2,}|\t+', line)
-            row = [cell.strip() for cell in row if cell.strip()]
-            if row:
-                table_data.append(row)
-    
-    return table_data
-
 st.title("📊 Table Screenshot Converter")
 st.markdown("Upload a screenshot of a table, and I'll convert it to CSV or XLSX format")
 
@@ -148,28 +43,13 @@ if uploaded_file is not None:
     st.sidebar.markdown("Adjust enhancement levels for better OCR results")
     
     # Set default values based on active preset
-    if st.session_state.preset_active == "clear":
-        default_contrast = 1.5
-        default_sharpness = 2.0
-        default_brightness = 1.0
-        default_denoise = False
-        default_binarize = True
-        default_threshold = 128
-    elif st.session_state.preset_active == "low_quality":
-        default_contrast = 2.5
-        default_sharpness = 2.5
-        default_brightness = 1.2
-        default_denoise = True
-        default_binarize = False
-        default_threshold = 128
-    else:
-        # Default values when no preset is active - all neutral
-        default_contrast = 1.0
-        default_sharpness = 1.0
-        default_brightness = 1.0
-        default_denoise = False
-        default_binarize = False
-        default_threshold = 128
+    defaults = PRESETS.get(st.session_state.preset_active, PRESETS[None])
+    default_contrast = defaults['contrast']
+    default_sharpness = defaults['sharpness']
+    default_brightness = defaults['brightness']
+    default_denoise = defaults['denoise']
+    default_binarize = defaults['binarize']
+    default_threshold = defaults['threshold']
     
     # Contrast enhancement slider
     contrast_level = st.sidebar.slider(
@@ -296,39 +176,11 @@ if uploaded_file is not None:
     st.subheader("Extracted Table")
     
     with st.spinner("Processing image..."):
-        # Extract text using Tesseract OCR on processed image
-        custom_config = r'--oem 3 --psm 6'
-        extracted_text = pytesseract.image_to_string(processed_image, config=custom_config)
+        # Extract text using Tesseract OCR, parse it and build the DataFrame
+        extracted_text, table_data, df, _ = extract_table(processed_image, expected_columns, has_header,
+                                                          refine_numbers=False)
         
-        # Parse the extracted text into a table with optional column hint
-        table_data = parse_table_data(extracted_text, expected_columns)
-        
-        if table_data:
-            # Determine max columns
-            max_cols = max(len(row) for row in table_data)
-            
-            # Pad rows to have equal columns
-            for row in table_data:
-                while len(row) < max_cols:
-                    row.append('')
-            
-            # Create DataFrame based on header selection
-            if has_header and len(table_data) > 1:
-                df = pd.DataFrame(table_data[1:], columns=table_data[0])
-            else:
-                # No header - use default column names
-                df = pd.DataFrame(table_data)
-                df.columns = [f'Column_{i+1}' for i in range(len(df.columns))]
-            
-            # Try to convert numeric columns
-            for col in df.columns:
-                try:
-                    # Remove common numeric separators and convert
-                    df[col] = df[col].str.replace(',', '').str.replace('$', '').str.strip()
-                    df[col] = pd.to_numeric(df[col], errors='ignore')
-                except:
-                    pass
-            
+        if df is not None:
             st.dataframe(df, use_container_width=True)
             
             st.subheader("Download Options")
@@ -0,0 +1,75 @@
+"""
+Cold-import benchmark for the img2tab core library
+
+Batch workers and process-pool children pay the import cost of everything
+they touch on every start. Each case below runs in a fresh interpreter and
+reports the median time spent importing, plus which heavy third-party
+packages ended up loaded.
+
+Usage:
+    python bench_startup.py --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ('streamlit', 'pandas', 'openpyxl', 'pytesseract', 'numpy', 'streamlit_paste_button')
+
+CASES = [
+    ("import img2tab", "import img2tab"),
+    ("parse_table_data", "from img2tab import parse_table_data"),
+    ("preprocess_image", "from img2tab import preprocess_image"),
+    ("extract_table", "from img2tab import extract_table"),
+    ("find_table_regions", "from img2tab import find_table_regions"),
+    ("ScrollStitcher", "from img2tab import ScrollStitcher"),
+    ("build_dataframe (call)", "from img2tab import build_dataframe; build_dataframe([['a'], ['1']])"),
+    ("eager UI stack (reference)", "import streamlit, pandas, pytesseract, openpyxl"),
+]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement, runs):
+    """Median import time of statement over fresh interpreters, and the heavy modules it loads"""
+    timings = []
+    loaded = []
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, env=env,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['seconds'])
+        loaded = result['loaded']
+    return statistics.median(timings), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of the img2tab core library")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case (default: 5)")
+    args = parser.parse_args()
+
+    print(f"{'case':<28} {'import ms':>10}  heavy modules loaded")
+    for name, statement in CASES:
+        try:
+            seconds, loaded = measure(statement, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<28} {'error':>10}  {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:<28} {seconds * 1000:>10.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
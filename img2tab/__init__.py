@@ -0,0 +1,66 @@
+"""
+Img2Tab core: turn table screenshots into rows and DataFrames, without any UI
+
+Public API (imported lazily - `import img2tab` loads no third-party package;
+each name pulls in only the submodule that defines it, and heavy dependencies
+such as pandas and pytesseract load only when a DataFrame is built or OCR
+actually runs):
+
+    preprocess_image, PRESETS            image preprocessing
+    OCR_CONFIG, ocr_with_data, ...       Tesseract OCR with word geometry
+    parse_table_data, build_dataframe    text -> rows -> typed DataFrame
+    extract_table                        OCR + parse + DataFrame in one call
+    get_scheduler, OcrScheduler          process-wide OCR concurrency control
+    find_table_regions, process_regions  several tables in one screenshot
+    ScrollStitcher                       overlapping scrolled screenshots
+    TableSnapshot, incremental_update    re-read only the rows that changed
+
+Example:
+    from PIL import Image
+    import img2tab
+
+    image = img2tab.preprocess_image(Image.open("table.png"), **img2tab.PRESETS["clear"])
+    text, rows, df, _ = img2tab.extract_table(image)
+"""
+
+import importlib
+
+_EXPORTS = {
+    'PRESETS': 'preprocess',
+    'preprocess_image': 'preprocess',
+    'OCR_CONFIG': 'ocr',
+    'ocr_with_data': 'ocr',
+    'parse_ocr_data': 'ocr',
+    'is_numeric_text': 'ocr',
+    'infer_numeric_columns': 'ocr',
+    'locate_rows': 'ocr',
+    'locate_cells': 'ocr',
+    'refine_numeric_cells': 'ocr',
+    'parse_table_data': 'parse',
+    'pad_rows': 'parse',
+    'build_dataframe': 'parse',
+    'extract_table': 'pipeline',
+    'OcrScheduler': 'scheduler',
+    'get_scheduler': 'scheduler',
+    'find_table_regions': 'regions',
+    'process_regions': 'regions',
+    'ScrollStitcher': 'stitch',
+    'TableSnapshot': 'incremental',
+    'incremental_update': 'incremental',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+    value = getattr(module, name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,144 @@
+"""
+Incremental re-extraction for repeated screenshots of the same table
+
+Dashboards are often captured every few minutes with only a few cells
+changing. After a full extraction, a snapshot keeps the image, the parsed rows
+and each row's vertical pixel span. For the next screenshot a vectorized
+block-wise pixel diff finds the changed areas, and only the rows whose strips
+changed are re-OCR'd (in parallel on the shared OCR scheduler) and patched
+into the previous rows.
+
+Anything the snapshot can't explain - a different image size, changes outside
+every known row, too many changed rows, or a re-read row that no longer fits
+the table - returns None so the caller falls back to a full extraction.
+"""
+
+import numpy as np
+
+from .ocr import locate_rows, parse_ocr_data
+from .scheduler import get_scheduler
+
+# A table row is one line of text
+ROW_CONFIG = r'--oem 3 --psm 7'
+
+
+class TableSnapshot:
+    """
+    State kept from the previous extraction
+
+    Args:
+        image: Original PIL Image the table was extracted from
+        table_data: Parsed, padded rows (lists of cell strings)
+        lines: OCR lines from ocr_with_data for the processed image
+        settings: Anything that affects extraction (preprocessing values,
+                  column hint, ...); a snapshot is only reused when it matches
+        ocr_rows: Rows exactly as parsed from the OCR text, when table_data
+                  was corrected afterwards (e.g. by refine_numeric_cells);
+                  rows are matched to OCR lines by text, so spans come from these
+    """
+
+    def __init__(self, image, table_data, lines, settings, ocr_rows=None):
+        self.pixels = _gray(image)
+        self.table_data = [list(row) for row in table_data]
+        self.row_spans = locate_rows(ocr_rows if ocr_rows is not None else table_data, lines)
+        self.settings = settings
+
+    def advance(self, image, table_data):
+        """Move the snapshot forward after an incremental update (row spans are unchanged)"""
+        self.pixels = _gray(image)
+        self.table_data = [list(row) for row in table_data]
+
+
+def _gray(image):
+    return np.asarray(image.convert('L'), dtype=np.uint8)
+
+
+def changed_rows(previous, current, block=16, tolerance=32, min_pixels=3):
+    """
+    Vectorized block-wise pixel diff between two same-sized grayscale arrays
+
+    A block counts as changed when at least min_pixels of its pixels differ by
+    more than tolerance, which ignores compression noise.
+
+    Returns:
+        Boolean array marking the pixel rows with real changes
+    """
+    height, width = previous.shape
+    pad_height, pad_width = -height % block, -width % block
+    differs = np.abs(previous.astype(np.int16) - current.astype(np.int16)) > tolerance
+    differs = np.pad(differs, ((0, pad_height), (0, pad_width)))
+    counts = differs.reshape((height + pad_height) // block, block,
+                             (width + pad_width) // block, block).sum(axis=(1, 3))
+    changed_blocks = counts >= min_pixels
+
+    # Blocks filter out noise; the differing pixels inside them give exact rows
+    in_changed_block = np.repeat(np.repeat(changed_blocks, block, axis=0), block, axis=1)
+    return (differs & in_changed_block).any(axis=1)[:height]
+
+
+def _ocr_strip(strip):
+    """Scheduler job: OCR one row strip as a single text line"""
+    import pytesseract
+    return parse_ocr_data(pytesseract.image_to_data(strip, config=ROW_CONFIG,
+                                                    output_type=pytesseract.Output.DICT))
+
+
+def incremental_update(snapshot, image, processed_image, parse_rows, settings, session_id=None,
+                       padding=4, max_changed_rows=0.5):
+    """
+    Re-OCR only the rows that changed since the snapshot
+
+    Args:
+        snapshot: TableSnapshot of the previous extraction
+        image: New original PIL Image (compared against the snapshot)
+        processed_image: New preprocessed PIL Image (cropped for re-OCR)
+        parse_rows: Callable turning OCR text into rows, e.g. parse_table_data
+                    with the same column hint as the full extraction
+        settings: Current extraction settings; must equal snapshot.settings
+        session_id: Caller's session, for fair queuing in the OCR scheduler
+        padding: Pixels added above and below each row strip
+        max_changed_rows: Fraction of rows above which a full pass is cheaper
+
+    Returns:
+        (table_data, changed_row_indices), or None if a full extraction is needed
+    """
+    pixels = _gray(image)
+    if settings != snapshot.settings or pixels.shape != snapshot.pixels.shape:
+        return None
+    if processed_image.size != image.size or not snapshot.row_spans:
+        return None
+
+    row_mask = changed_rows(snapshot.pixels, pixels)
+    if not row_mask.any():
+        return [list(row) for row in snapshot.table_data], []
+
+    height = len(row_mask)
+    covered = np.zeros(height, dtype=bool)
+    changed = []
+    for row_index, (top, bottom) in sorted(snapshot.row_spans.items()):
+        top, bottom = max(top - padding, 0), min(bottom + padding, height)
+        covered[top:bottom] = True
+        if row_mask[top:bottom].any():
+            changed.append((row_index, top, bottom))
+
+    # Something changed outside every known row (new row, moved layout, ...)
+    if (row_mask & ~covered).any():
+        return None
+    if len(changed) > max_changed_rows * len(snapshot.table_data):
+        return None
+
+    scheduler = get_scheduler()
+    futures = [
+        scheduler.submit(session_id, _ocr_strip, processed_image.crop((0, top, processed_image.width, bottom)))
+        for _, top, bottom in changed
+    ]
+
+    table_data = [list(row) for row in snapshot.table_data]
+    for (row_index, _, _), future in zip(changed, futures):
+        text, _ = future.result()
+        rows = parse_rows(text)
+        width = len(table_data[row_index])
+        if len(rows) != 1 or len(rows[0]) > width:
+            return None
+        table_data[row_index] = rows[0] + [''] * (width - len(rows[0]))
+    return table_data, [row_index for row_index, _, _ in changed]
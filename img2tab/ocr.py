@@ -0,0 +1,272 @@
+"""
+OCR with word geometry, and selective re-OCR of low-confidence numeric cells
+
+The main OCR pass treats every cell as free text. This module uses the per-word
+confidences from a single image_to_data call to find the weak cells in columns
+that look numeric, and re-reads only those crops with a digit whitelist.
+"""
+
+import re
+
+from PIL import Image
+
+from .scheduler import get_scheduler, image_to_data
+
+# Main pass: LSTM engine, one uniform block of text
+OCR_CONFIG = r'--oem 3 --psm 6'
+
+# Characters that can legitimately appear in a financial number
+NUMERIC_WHITELIST = "0123456789.,-$%()"
+NUMERIC_CONFIG = r'--oem 3 --psm 7 -c tessedit_char_whitelist=' + NUMERIC_WHITELIST
+
+_NUMBER_RE = re.compile(r'^\(?-?\$?\(?\d[\d,]*(\.\d+)?\)?%?\)?$')
+
+
+def ocr_with_data(image, config=OCR_CONFIG, session_id=None):
+    """
+    Run Tesseract once and return both the plain text and the word geometry
+
+    Args:
+        image: PIL Image object
+        config: Tesseract config string
+        session_id: Caller's session, used for fair queuing in the OCR scheduler
+
+    Returns:
+        (text, lines) where text has one OCR line per text line, with column
+        gaps marked by two spaces, and lines is a list of OCR lines, each a
+        list of word dicts with text, box and conf
+    """
+    return parse_ocr_data(image_to_data(image, config=config, session_id=session_id))
+
+
+def _join_line(words, column_gap=0.8):
+    """
+    Join a line's words, using two spaces where the horizontal gap looks like a column break
+
+    Tesseract separates every word with one space, which would leave a whole
+    table row in one cell. A gap wider than column_gap times the line's median
+    word height is far more than a normal word space, so it starts a new cell.
+    """
+    heights = sorted(word['height'] for word in words)
+    min_gap = column_gap * heights[len(heights) // 2]
+    text = words[0]['text']
+    for previous, word in zip(words, words[1:]):
+        gap = word['left'] - (previous['left'] + previous['width'])
+        text += ('  ' if gap > min_gap else ' ') + word['text']
+    return text
+
+
+def parse_ocr_data(data):
+    """
+    Group an image_to_data result (dict output) into text and OCR lines
+
+    Returns:
+        (text, lines) in the same form as ocr_with_data
+    """
+    lines = []
+    current_key = None
+    for i, word in enumerate(data['text']):
+        word = word.strip()
+        if not word:
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if key != current_key:
+            lines.append([])
+            current_key = key
+        lines[-1].append({
+            'text': word,
+            'left': data['left'][i],
+            'top': data['top'][i],
+            'width': data['width'][i],
+            'height': data['height'][i],
+            'conf': float(data['conf'][i]),
+        })
+
+    text = '\n'.join(_join_line(line) for line in lines)
+    return text, lines
+
+
+def is_numeric_text(value):
+    """Check whether a cell string looks like a number (1,234.50 / $12 / (3.4) / 5%)"""
+    return bool(_NUMBER_RE.match(value.replace(' ', '')))
+
+
+def _mostly_digits(value):
+    """
+    Loose check that tolerates OCR slips like 'l,2O0' when inferring column types
+
+    Every word must be mostly digits (or bare punctuation such as '$'), so a
+    label merged into the same cell keeps the cell from counting as numeric.
+    """
+    found_digit = False
+    for token in value.split():
+        alnum = [char for char in token if char.isalnum()]
+        digits = sum(1 for char in alnum if char.isdigit())
+        if alnum and digits / len(alnum) < 0.5:
+            return False
+        found_digit = found_digit or digits > 0
+    return found_digit
+
+
+def infer_numeric_columns(table_data, has_header=True, min_ratio=0.6):
+    """
+    Find columns where most non-empty body cells look numeric
+
+    Cells are judged loosely (mostly digits) so the misreads we want to fix do
+    not stop their own column from being recognised as numeric.
+
+    Args:
+        table_data: List of rows (lists of cell strings), already padded
+        has_header: Whether the first row holds column names
+        min_ratio: Fraction of non-empty cells that must look numeric
+    """
+    body = table_data[1:] if has_header and len(table_data) > 1 else table_data
+    if not body:
+        return []
+
+    numeric_columns = []
+    for col in range(max(len(row) for row in body)):
+        values = [row[col] for row in body if col < len(row) and row[col]]
+        if not values:
+            continue
+        numeric_count = sum(1 for value in values if _mostly_digits(value))
+        if numeric_count / len(values) >= min_ratio:
+            numeric_columns.append(col)
+    return numeric_columns
+
+
+def _match_rows(table_data, lines):
+    """
+    Yield (row_index, line_words) for each parsed row found among the OCR lines
+
+    Rows are matched to OCR lines by their whitespace-free text, so rows dropped
+    by the column-count hint do not shift the alignment.
+    """
+    line_index = 0
+    for row_index, row in enumerate(table_data):
+        row_key = ''.join(''.join(row).split())
+        if not row_key:
+            continue
+
+        # Advance to the OCR line this row was parsed from
+        for j in range(line_index, len(lines)):
+            if ''.join(word['text'] for word in lines[j]) == row_key:
+                line_index = j + 1
+                yield row_index, lines[j]
+                break
+
+
+def locate_rows(table_data, lines):
+    """
+    Map parsed table rows to the vertical pixel span of their OCR line
+
+    Returns:
+        Dict of row index -> (top, bottom)
+    """
+    return {
+        row_index: (min(word['top'] for word in words),
+                    max(word['top'] + word['height'] for word in words))
+        for row_index, words in _match_rows(table_data, lines)
+    }
+
+
+def locate_cells(table_data, lines):
+    """
+    Map parsed table cells back to the OCR words they were built from
+
+    Within a row, each cell consumes as many words as it has tokens.
+
+    Returns:
+        Dict of (row, col) -> {'box': (left, top, right, bottom), 'conf': float}
+    """
+    cells = {}
+    for row_index, words in _match_rows(table_data, lines):
+        row = table_data[row_index]
+        position = 0
+        for col_index, cell in enumerate(row):
+            tokens = cell.split()
+            if not tokens:
+                continue
+            cell_words = words[position:position + len(tokens)]
+            position += len(tokens)
+            if [word['text'] for word in cell_words] != tokens:
+                break
+            cells[(row_index, col_index)] = {
+                'box': (
+                    min(word['left'] for word in cell_words),
+                    min(word['top'] for word in cell_words),
+                    max(word['left'] + word['width'] for word in cell_words),
+                    max(word['top'] + word['height'] for word in cell_words),
+                ),
+                'conf': min(word['conf'] for word in cell_words),
+            }
+    return cells
+
+
+def _reocr_crop(crop):
+    """Re-read a single cell crop as one line of digits and punctuation"""
+    import pytesseract
+    return pytesseract.image_to_string(crop, config=NUMERIC_CONFIG).strip()
+
+
+def _crop_cell(image, box, padding=4, min_height=32):
+    """Crop a cell with a little padding and upscale tiny crops for Tesseract"""
+    left, top, right, bottom = box
+    crop = image.crop((
+        max(left - padding, 0),
+        max(top - padding, 0),
+        min(right + padding, image.width),
+        min(bottom + padding, image.height),
+    ))
+    if crop.height < min_height:
+        scale = min_height / max(crop.height, 1)
+        crop = crop.resize((max(int(crop.width * scale), 1), min_height), Image.LANCZOS)
+    return crop
+
+
+def refine_numeric_cells(image, table_data, lines, has_header=True, min_conf=80.0, session_id=None):
+    """
+    Re-OCR low-confidence cells in numeric columns and patch table_data in place
+
+    Only cells whose weakest word falls below min_conf are cropped and re-read,
+    so a clean table costs nothing extra. A re-read value is kept only if it
+    parses as a number.
+
+    Args:
+        image: The processed PIL Image that produced the OCR lines
+        table_data: Padded list of rows (lists of cell strings)
+        lines: OCR lines returned by ocr_with_data
+        has_header: Whether the first row holds column names
+        min_conf: Tesseract confidence (0-100) below which a cell is re-read
+        session_id: Caller's session; crops are re-read in parallel on the
+                    shared OCR scheduler
+
+    Returns:
+        Number of cells that were replaced
+    """
+    numeric_columns = set(infer_numeric_columns(table_data, has_header))
+    if not numeric_columns:
+        return 0
+
+    first_body_row = 1 if has_header and len(table_data) > 1 else 0
+    targets = [
+        (position, cell['box'])
+        for position, cell in locate_cells(table_data, lines).items()
+        if position[1] in numeric_columns
+        and position[0] >= first_body_row
+        and cell['conf'] < min_conf
+    ]
+    if not targets:
+        return 0
+
+    crops = [_crop_cell(image, box) for _, box in targets]
+    scheduler = get_scheduler()
+    futures = [scheduler.submit(session_id, _reocr_crop, crop) for crop in crops]
+    results = [future.result() for future in futures]
+
+    replaced = 0
+    for ((row, col), _), value in zip(targets, results):
+        if value and is_numeric_text(value) and value != table_data[row][col]:
+            table_data[row][col] = value
+            replaced += 1
+    return replaced
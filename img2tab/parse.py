@@ -0,0 +1,103 @@
+"""
+Parsing OCR text into rows, and rows into a typed DataFrame
+
+pandas is imported only when a DataFrame is actually built, so workers that
+only parse rows (stitching, incremental refresh, manifests) start quickly.
+"""
+
+import re
+
+
+def parse_table_data(extracted_text, expected_columns=None):
+    """
+    Parse extracted text into table data with optional column hint
+    """
+    lines = extracted_text.strip().split('\n')
+    lines = [line.strip() for line in lines if line.strip()]
+
+    table_data = []
+
+    if expected_columns:
+        # Use column count hint for better parsing
+        for line in lines:
+            # Try multiple splitting strategies
+            # Strategy 1: Split by multiple spaces or tabs
+            row = re.split(r'\s{2,}|\t+', line)
+            row = [cell.strip() for cell in row if cell.strip()]
+
+            # Strategy 2: If we don't have expected columns, try single space split
+            if len(row) != expected_columns:
+                row = line.split()
+                row = [cell.strip() for cell in row if cell.strip()]
+
+            # Strategy 3: Try to intelligently group tokens
+            if len(row) > expected_columns:
+                # Too many columns - try to merge adjacent tokens
+                new_row = []
+                i = 0
+                while i < len(row) and len(new_row) < expected_columns:
+                    if len(new_row) == expected_columns - 1:
+                        # Last column - join remaining
+                        new_row.append(' '.join(row[i:]))
+                        break
+                    else:
+                        new_row.append(row[i])
+                        i += 1
+                row = new_row
+            elif len(row) < expected_columns and len(row) > 0:
+                # Too few columns - pad with empty strings
+                while len(row) < expected_columns:
+                    row.append('')
+
+            if row and len(row) == expected_columns:
+                table_data.append(row)
+    else:
+        # Original parsing method without column hint
+        for line in lines:
+            row = re.split(r'\s{2,}|\t+', line)
+            row = [cell.strip() for cell in row if cell.strip()]
+            if row:
+                table_data.append(row)
+
+    return table_data
+
+
+def pad_rows(table_data):
+    """Pad rows in place with empty strings so every row has the same number of cells"""
+    max_cols = max(len(row) for row in table_data)
+    for row in table_data:
+        while len(row) < max_cols:
+            row.append('')
+    return table_data
+
+
+def build_dataframe(table_data, has_header=True):
+    """
+    Turn parsed rows into a DataFrame and convert numeric-looking columns
+
+    Args:
+        table_data: List of rows (lists of cell strings)
+        has_header: Use the first row as column names
+    """
+    import pandas as pd
+
+    pad_rows(table_data)
+
+    # Create DataFrame based on header selection
+    if has_header and len(table_data) > 1:
+        df = pd.DataFrame(table_data[1:], columns=table_data[0])
+    else:
+        # No header - use default column names
+        df = pd.DataFrame(table_data)
+        df.columns = [f'Column_{i+1}' for i in range(len(df.columns))]
+
+    # Try to convert numeric columns
+    for col in df.columns:
+        try:
+            # Remove common numeric separators and convert
+            df[col] = df[col].str.replace(',', '').str.replace('$', '').str.strip()
+            df[col] = pd.to_numeric(df[col], errors='ignore')
+        except:
+            pass
+
+    return df
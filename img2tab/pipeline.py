@@ -0,0 +1,40 @@
+"""
+End-to-end extraction of one table from a preprocessed image
+"""
+
+from .ocr import OCR_CONFIG, ocr_with_data, refine_numeric_cells
+from .parse import build_dataframe, pad_rows, parse_table_data
+
+
+def extract_table(processed_image, expected_columns=None, has_header=True, refine_numbers=True, session_id=None,
+                  ocr_result=None):
+    """
+    Run OCR, parsing and DataFrame creation on one preprocessed image
+
+    Safe to call from worker threads.
+
+    Args:
+        ocr_result: Optional (text, lines) already computed for processed_image,
+                    e.g. by speculative prefetch; skips the OCR call
+
+    Returns:
+        (extracted_text, table_data, df or None, number of re-checked numeric cells)
+    """
+    if ocr_result is None:
+        ocr_result = ocr_with_data(processed_image, config=OCR_CONFIG, session_id=session_id)
+    extracted_text, ocr_lines = ocr_result
+
+    # Parse the extracted text into a table with optional column hint
+    table_data = parse_table_data(extracted_text, expected_columns)
+    if not table_data:
+        return extracted_text, table_data, None, 0
+
+    pad_rows(table_data)
+
+    # Re-OCR low-confidence cells in numeric columns before type conversion
+    refined_cells = 0
+    if refine_numbers:
+        refined_cells = refine_numeric_cells(processed_image, table_data, ocr_lines,
+                                             has_header=has_header, session_id=session_id)
+
+    return extracted_text, table_data, build_dataframe(table_data, has_header), refined_cells
@@ -0,0 +1,122 @@
+"""
+Speculative background OCR of preprocessing presets
+
+After an image arrives, users often switch to one of the quick presets, which
+reruns the app and blocks on a fresh OCR pass. This module runs the presets'
+preprocessing + OCR ahead of time as speculative jobs on the shared OCR
+scheduler (low priority, within its speculative worker budget, and skipped
+entirely when the server is busy) and keeps the results in a small
+process-wide cache keyed by image content and preprocessing settings.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import hashlib
+import threading
+
+from .ocr import parse_ocr_data
+from .scheduler import get_scheduler
+
+# Niceness for speculative Tesseract processes, so real work wins the CPU
+SPECULATIVE_NICE = 10
+# Entries are OCR text and word boxes only; scroll captures add one or two per screenshot
+CACHE_SIZE = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def image_digest(image):
+    """Content hash of a PIL Image (pixels, mode and size)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode}{image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(digest, settings, config):
+    """Cache key for one image under one set of preprocessing settings"""
+    normalized = tuple(sorted(
+        (name, round(value, 3) if isinstance(value, float) else value)
+        for name, value in settings.items()
+    ))
+    return digest, normalized, config
+
+
+def _put(key, value):
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def remember(key, ocr_result):
+    """Store a finished (text, lines) OCR result"""
+    _put(key, ocr_result)
+
+
+def take(key):
+    """
+    Return a cached or prefetched (text, lines) result, or None
+
+    A speculative job that is still queued is cancelled so the caller can run
+    it at normal priority; one that is already running is waited for, since
+    it is further along than a fresh run would be.
+    """
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is None:
+        return None
+    if not isinstance(entry, Future):
+        return entry
+    if not entry.done() and entry.cancel():
+        with _cache_lock:
+            _cache.pop(key, None)
+        return None
+    try:
+        return entry.result()
+    except Exception:
+        return None
+
+
+def _speculative_ocr(image, preprocess, settings, config):
+    """Scheduler job: preprocess and OCR one preset at reduced CPU priority"""
+    import pytesseract
+    processed = preprocess(image, **settings)
+    data = pytesseract.image_to_data(processed, config=config, nice=SPECULATIVE_NICE,
+                                     output_type=pytesseract.Output.DICT)
+    return parse_ocr_data(data)
+
+
+def prefetch(image, digest, preprocess, settings_list, config):
+    """
+    Queue speculative OCR for each settings dict not already cached
+
+    Stops at the first job the scheduler refuses (server too busy).
+
+    Args:
+        image: Original PIL Image
+        digest: image_digest(image)
+        preprocess: Callable preprocess(image, **settings) -> PIL Image
+        settings_list: Preprocessing settings dicts to prepare
+        config: Tesseract config string
+
+    Returns:
+        Number of jobs queued
+    """
+    scheduler = get_scheduler()
+    # Load pixel data now; workers must not read from the upload stream concurrently
+    image = image.copy()
+    queued = 0
+    for settings in settings_list:
+        key = cache_key(digest, settings, config)
+        with _cache_lock:
+            if key in _cache:
+                continue
+        future = scheduler.submit_speculative(_speculative_ocr, image, preprocess, settings, config)
+        if future is None:
+            break
+        _put(key, future)
+        queued += 1
+    return queued
@@ -0,0 +1,63 @@
+"""
+Image preprocessing applied before OCR
+"""
+
+from PIL import ImageEnhance, ImageFilter, ImageOps
+
+# Preprocessing settings for each quick preset (None = neutral defaults)
+PRESETS = {
+    None: dict(contrast=1.0, sharpness=1.0, brightness=1.0, denoise=False, binarize=False, threshold=128),
+    "clear": dict(contrast=1.5, sharpness=2.0, brightness=1.0, denoise=False, binarize=True, threshold=128),
+    "low_quality": dict(contrast=2.5, sharpness=2.5, brightness=1.2, denoise=True, binarize=False, threshold=128),
+}
+
+
+def preprocess_image(image, contrast=1.0, sharpness=1.0, brightness=1.0, denoise=False, binarize=False, threshold=128):
+    """
+    Preprocess image to improve OCR accuracy with adjustable levels
+
+    Args:
+        image: PIL Image object
+        contrast: Contrast level (1.0 = original, >1.0 = more contrast)
+        sharpness: Sharpness level (1.0 = original, >1.0 = sharper)
+        brightness: Brightness level (1.0 = original, >1.0 = brighter)
+        denoise: Boolean to apply noise reduction
+        binarize: Boolean to convert to black & white
+        threshold: Threshold for binarization (0-255)
+    """
+    processed = image.copy()
+
+    # Convert to RGB if needed
+    if processed.mode != 'L' and processed.mode != 'RGB':
+        processed = processed.convert('RGB')
+
+    # Denoise first (if enabled)
+    if denoise:
+        processed = processed.filter(ImageFilter.MedianFilter(size=3))
+
+    # Adjust brightness
+    if brightness != 1.0:
+        enhancer = ImageEnhance.Brightness(processed)
+        processed = enhancer.enhance(brightness)
+
+    # Enhance contrast
+    if contrast != 1.0:
+        enhancer = ImageEnhance.Contrast(processed)
+        processed = enhancer.enhance(contrast)
+
+    # Enhance sharpness
+    if sharpness != 1.0:
+        enhancer = ImageEnhance.Sharpness(processed)
+        processed = enhancer.enhance(sharpness)
+
+    # Apply additional edge enhancement for high sharpness
+    if sharpness > 2.0:
+        processed = processed.filter(ImageFilter.EDGE_ENHANCE)
+
+    # Binarize (convert to pure black and white)
+    if binarize:
+        processed = processed.convert('L')
+        processed = ImageOps.autocontrast(processed)
+        processed = processed.point(lambda p: 255 if p > threshold else 0)
+
+    return processed
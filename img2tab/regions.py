@@ -0,0 +1,266 @@
+"""
+Split a screenshot that holds several tables into separate table regions
+
+Regions are found with a recursive XY-cut on the ink projection profiles. A
+region is cut at its widest whitespace gutter, rows or columns, as long as
+that gutter is clearly wider than the region's other gaps (so the regular gaps
+between a table's own rows and columns never qualify) and at least a few
+text-line heights wide. Side-by-side pieces whose text lines sit at the same
+heights are then merged back, since those are columns of one table.
+
+Ruling lines count as ink when cutting, so a bordered table is never cut
+through its grid, but they are left out when measuring text lines - vertical
+grid lines would otherwise join every row of a table into one band.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import ImageOps
+
+
+def _ink_mask(image, ink_threshold):
+    """Boolean array that is True wherever a pixel is darker than the page"""
+    gray = np.asarray(ImageOps.autocontrast(image.convert('L')), dtype=np.uint8)
+    mask = gray < ink_threshold
+    # Dark-mode screenshots: text is the minority, so flip if "ink" dominates
+    if mask.mean() > 0.5:
+        mask = ~mask
+    return mask
+
+
+def _runs(flags):
+    """Return (start, end) pairs of consecutive True values in a 1-D boolean array"""
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _long_runs(mask, length):
+    """True wherever a pixel lies on a horizontal run of at least length ink pixels"""
+    height, width = mask.shape
+    if length > width:
+        return np.zeros_like(mask)
+    counts = np.cumsum(np.pad(mask, ((0, 0), (1, 0))), axis=1, dtype=np.int32)
+    # full[:, j]: the window of length pixels starting at column j is all ink
+    full = (counts[:, length:] - counts[:, :-length]) == length
+    starts = np.cumsum(np.pad(full, ((0, 0), (1, 0))), axis=1, dtype=np.int32)
+    # A pixel is covered if any full window starts within length - 1 pixels to its left
+    columns = np.arange(width)
+    first = np.maximum(columns - length + 1, 0)
+    last = np.minimum(columns, width - length) + 1
+    return (starts[:, last] - starts[:, first]) > 0
+
+
+def _line_height(mask):
+    """Median height of the horizontal ink bands, i.e. a typical text line"""
+    heights = [end - start for start, end in _runs(mask.any(axis=1))]
+    return float(np.median(heights)) if heights else 0.0
+
+
+def _gaps(mask, axis):
+    """Ink spans along an axis (0 = rows, 1 = columns) and the blank gaps between them"""
+    spans = _runs(mask.any(axis=1 - axis))
+    gaps = [next_start - end for (_, end), (next_start, _) in zip(spans, spans[1:])]
+    return spans, gaps
+
+
+def _find_cut(mask, axis, min_gap, min_size, ratio):
+    """
+    Pick the gutter to cut a region at along one axis
+
+    Gutters are tried widest first. One qualifies when it is at least min_gap
+    wide, more than ratio times the median of the region's other gaps, and
+    leaves at least min_size of ink on each side (a caption or a lone line
+    stays with its table).
+
+    Returns:
+        (before_end, after_start) of the gutter, or None
+    """
+    spans, gaps = _gaps(mask, axis)
+    for index in sorted(range(len(gaps)), key=lambda i: -gaps[i]):
+        gap = gaps[index]
+        others = gaps[:index] + gaps[index + 1:]
+        if gap < min_gap or (others and gap <= ratio * float(np.median(others))):
+            return None
+        if (spans[index][1] - spans[0][0] >= min_size
+                and spans[-1][1] - spans[index + 1][0] >= min_size):
+            return spans[index][1], spans[index + 1][0]
+    return None
+
+
+def _xy_cut(mask, left, top, gaps, min_sizes, ratio):
+    """
+    Recursively cut a region at its most convincing gutter and return leaf boxes
+
+    A region becomes a leaf once neither axis has a gutter that qualifies.
+    """
+    for axis in (0, 1):
+        cut = _find_cut(mask, axis, gaps[axis], min_sizes[axis], ratio)
+        if cut is None:
+            continue
+        before_end, after_start = cut
+        if axis == 0:
+            return (_xy_cut(mask[:before_end], left, top, gaps, min_sizes, ratio)
+                    + _xy_cut(mask[after_start:], left, top + after_start, gaps, min_sizes, ratio))
+        return (_xy_cut(mask[:, :before_end], left, top, gaps, min_sizes, ratio)
+                + _xy_cut(mask[:, after_start:], left + after_start, top, gaps, min_sizes, ratio))
+
+    rows, columns = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+    if not len(rows):
+        return []
+    return [(left + int(columns[0]), top + int(rows[0]), left + int(columns[-1]) + 1, top + int(rows[-1]) + 1)]
+
+
+def _text_lines(text, box):
+    """(top, bottom) spans of the text lines inside a box, in image coordinates"""
+    box_left, box_top, box_right, box_bottom = box
+    return [(box_top + start, box_top + end)
+            for start, end in _runs(text[box_top:box_bottom, box_left:box_right].any(axis=1))]
+
+
+def _lines_align(lines_a, lines_b, tolerance, min_ratio=0.8):
+    """
+    Whether two boxes' text lines sit at the same heights where the boxes overlap
+
+    Checked both ways, so two tables with different row pitches don't pass on
+    the lines that happen to coincide.
+    """
+    top = max(lines_a[0][0], lines_b[0][0]) - tolerance if lines_a and lines_b else 0
+    bottom = min(lines_a[-1][1], lines_b[-1][1]) + tolerance if lines_a and lines_b else 0
+    lines_a = [line for line in lines_a if line[0] >= top and line[1] <= bottom]
+    lines_b = [line for line in lines_b if line[0] >= top and line[1] <= bottom]
+    if min(len(lines_a), len(lines_b)) < 2:
+        return False
+
+    def matched(lines, others):
+        return sum(
+            1 for line_top, line_bottom in lines
+            if any(abs(line_top - other_top) <= tolerance and abs(line_bottom - other_bottom) <= tolerance
+                   for other_top, other_bottom in others)
+        )
+    return (matched(lines_a, lines_b) >= min_ratio * len(lines_a)
+            and matched(lines_b, lines_a) >= min_ratio * len(lines_b))
+
+
+def _widest_column_gap(text, box, min_gap):
+    """Widest blank gap between the text columns inside a box (0 for a single column)"""
+    box_left, box_top, box_right, box_bottom = box
+    _, gaps = _gaps(text[box_top:box_bottom, box_left:box_right], axis=1)
+    # Narrower gaps are spaces between words of one cell
+    return max((gap for gap in gaps if gap >= min_gap), default=0)
+
+
+def _framed(vertical_rules, box, column):
+    """Whether a vertical ruling line runs along most of the box height at the given column"""
+    _, box_top, _, box_bottom = box
+    edge = vertical_rules[box_top:box_bottom, max(column - 2, 0):column + 3]
+    return edge.any(axis=1).mean() > 0.5
+
+
+def _merge_aligned(boxes, text, vertical_rules, line_height, max_gap_ratio=4.0):
+    """
+    Merge side-by-side boxes whose text lines line up: they are columns of one table
+
+    Boxes are not merged across a vertical ruling line (separately framed
+    tables), nor across a gap much wider than the columns inside them.
+    """
+    boxes = list(boxes)
+    tolerance = max(2.0, line_height / 4)
+    merged = True
+    while merged:
+        merged = False
+        boxes.sort(key=lambda box: (box[0], box[1]))
+        for i, a in enumerate(boxes):
+            for j, b in enumerate(boxes):
+                if i == j or b[0] < a[2]:
+                    continue
+                overlap = min(a[3], b[3]) - max(a[1], b[1])
+                if overlap < 0.5 * min(a[3] - a[1], b[3] - b[1]):
+                    continue
+                # Only neighbours: nothing else may sit in the gutter between them
+                if any(k not in (i, j) and c[0] < b[0] and c[2] > a[2]
+                       and min(c[3], a[3], b[3]) > max(c[1], a[1], b[1])
+                       for k, c in enumerate(boxes)):
+                    continue
+                if _framed(vertical_rules, a, a[2] - 1) or _framed(vertical_rules, b, b[0]):
+                    continue
+                inner_gap = max(_widest_column_gap(text, a, line_height), _widest_column_gap(text, b, line_height))
+                if inner_gap and b[0] - a[2] > max_gap_ratio * inner_gap:
+                    continue
+                if not _lines_align(_text_lines(text, a), _text_lines(text, b), tolerance):
+                    continue
+                boxes[i] = (a[0], min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                del boxes[j]
+                merged = True
+                break
+            if merged:
+                break
+    return boxes
+
+
+def find_table_regions(image, row_gap=2.0, col_gap=5.0, gap_ratio=2.0, ink_threshold=128, padding=6,
+                       rule_length=None):
+    """
+    Find the separate tables in a screenshot
+
+    Args:
+        image: PIL Image object
+        row_gap: Minimum blank gutter between stacked tables, in text-line heights
+        col_gap: Minimum blank gutter between side-by-side tables, in text-line
+                 heights (kept wider than row_gap so table columns stay together)
+        gap_ratio: How many times wider than the region's other gaps (median)
+                   a gutter must be to separate two tables
+        ink_threshold: Gray level (0-255) below which a pixel counts as ink
+        padding: Pixels of margin added around each region
+        rule_length: Shortest straight ink run, in pixels, treated as a ruling
+                     line rather than text (default: 1/25 of the shorter side,
+                     at least 25)
+
+    Returns:
+        List of (left, top, right, bottom) boxes in reading order
+    """
+    mask = _ink_mask(image, ink_threshold)
+    if rule_length is None:
+        rule_length = max(25, min(mask.shape) // 25)
+    vertical_rules = _long_runs(mask.T, rule_length).T
+    text = mask & ~(_long_runs(mask, rule_length) | vertical_rules)
+    line_height = _line_height(text)
+    if not line_height:
+        return []
+
+    boxes = _xy_cut(mask, 0, 0, (row_gap * line_height, col_gap * line_height),
+                    (1.5 * line_height, line_height), gap_ratio)
+    boxes = _merge_aligned(boxes, text, vertical_rules, line_height)
+
+    width, height = image.size
+    padded = [
+        (int(max(box_left - padding, 0)), int(max(box_top - padding, 0)),
+         int(min(box_right + padding, width)), int(min(box_bottom + padding, height)))
+        for box_left, box_top, box_right, box_bottom in boxes
+    ]
+    return sorted(padded, key=lambda box: (box[1], box[0]))
+
+
+def process_regions(image, regions, process, max_workers=None):
+    """
+    Run process(crop) for every region concurrently
+
+    OCR inside process should go through the shared OCR scheduler, which caps
+    the real Tesseract parallelism; these threads only overlap preprocessing
+    and waiting.
+
+    Args:
+        image: PIL Image object the regions were found in
+        regions: Boxes from find_table_regions
+        process: Callable taking a cropped PIL Image
+        max_workers: Thread count (default: one per region)
+
+    Returns:
+        Results of process, in the same order as regions
+    """
+    if not regions:
+        return []
+    crops = [image.crop(box) for box in regions]
+    with ThreadPoolExecutor(max_workers=max_workers or len(crops)) as executor:
+        return list(executor.map(process, crops))
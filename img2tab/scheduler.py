@@ -0,0 +1,216 @@
+"""
+Process-wide OCR scheduler shared by every Streamlit session
+
+Streamlit re-executes the app script on every interaction, but imported modules
+stay loaded, so the scheduler defined here is created once per server process.
+All Tesseract calls go through a bounded set of worker threads, jobs are taken
+round-robin across sessions so one heavy user cannot starve the others, and
+queue depth / wait times are recorded for monitoring.
+
+Speculative jobs (work that may never be needed, such as prefetching preset
+results) go to a separate low-priority lane: they are refused outright when
+the pool is busy, only start when no regular job is waiting, and never occupy
+more than a fixed share of the workers.
+
+Configuration (environment variables):
+    IMG2TAB_OCR_WORKERS: Number of Tesseract processes allowed at once
+                         (default: number of CPUs)
+    OMP_THREAD_LIMIT:    Threads per Tesseract process (default: 1, so the
+                         worker count alone decides CPU usage)
+    IMG2TAB_SPECULATIVE_WORKERS: Workers speculative jobs may use at once
+                         (default: half of the workers, at least 1)
+"""
+
+from collections import deque
+from concurrent.futures import Future
+import os
+import threading
+import time
+
+# Tesseract reads this from its environment; one thread per process keeps the
+# worker count an honest measure of CPU use instead of workers x OpenMP threads
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+DEFAULT_SESSION = 'default'
+
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class OcrScheduler:
+    """
+    Bounded worker pool with fair round-robin queuing between sessions
+
+    Args:
+        workers: Maximum number of jobs running at once
+        speculative_workers: Maximum number of speculative jobs running at once
+                             (default: half the workers). At least one worker is
+                             always kept free for regular jobs, so a single-worker
+                             scheduler never runs speculative work
+        history: Number of recent jobs kept for wait/run time metrics
+    """
+
+    def __init__(self, workers=None, speculative_workers=None, history=500):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        # A running job can't be preempted, so speculation never gets every worker
+        self.speculative_workers = min(max(1, speculative_workers or self.workers // 2), self.workers - 1)
+        self._condition = threading.Condition()
+        self._queues = {}
+        self._order = deque()
+        self._speculative = deque()
+        self._running = 0
+        self._running_speculative = 0
+        self._skipped_speculative = 0
+        self._completed = 0
+        self._wait_times = deque(maxlen=history)
+        self._run_times = deque(maxlen=history)
+        self._threads = []
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"ocr-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, session_id, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) for a session and return a Future
+
+        Do not wait on the returned Future from inside another scheduled job:
+        with every worker blocked that way the pool would deadlock.
+        """
+        future = Future()
+        session_id = session_id or DEFAULT_SESSION
+        with self._condition:
+            if session_id not in self._queues:
+                self._queues[session_id] = deque()
+                self._order.append(session_id)
+            self._queues[session_id].append((future, fn, args, kwargs, time.monotonic()))
+            self._condition.notify()
+        return future
+
+    def submit_speculative(self, fn, *args, **kwargs):
+        """
+        Queue a low-priority job, or return None if the pool is too busy for it
+
+        The job is refused if regular work is waiting, every worker is busy, or
+        enough speculative work is already queued. Callers may cancel() the
+        returned Future while it is still queued.
+        """
+        with self._condition:
+            if (self._order
+                    or self._running >= self.workers
+                    or len(self._speculative) >= self.speculative_workers * 2):
+                self._skipped_speculative += 1
+                return None
+            future = Future()
+            self._speculative.append((future, fn, args, kwargs, time.monotonic()))
+            self._condition.notify()
+        return future
+
+    def run(self, session_id, fn, *args, **kwargs):
+        """Submit a job and block until its result is ready"""
+        return self.submit(session_id, fn, *args, **kwargs).result()
+
+    def _next_job(self):
+        """Pop the oldest job of the next session in round-robin order (lock held)"""
+        session_id = self._order.popleft()
+        queue = self._queues[session_id]
+        job = queue.popleft()
+        if queue:
+            self._order.append(session_id)
+        else:
+            del self._queues[session_id]
+        return job
+
+    def _speculative_ready(self):
+        """Whether a speculative job may start now (lock held)"""
+        return (not self._order
+                and self._speculative
+                and self._running_speculative < self.speculative_workers)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._order and not self._speculative_ready():
+                    self._condition.wait()
+                speculative = not self._order
+                if speculative:
+                    future, fn, args, kwargs, queued_at = self._speculative.popleft()
+                    self._running_speculative += 1
+                else:
+                    future, fn, args, kwargs, queued_at = self._next_job()
+                self._running += 1
+
+            started_at = time.monotonic()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as exc:
+                    future.set_exception(exc)
+            finished_at = time.monotonic()
+
+            with self._condition:
+                self._running -= 1
+                if speculative:
+                    self._running_speculative -= 1
+                    # A speculative slot opened up; let a waiting worker take it
+                    self._condition.notify()
+                    continue
+                self._completed += 1
+                self._wait_times.append(started_at - queued_at)
+                self._run_times.append(finished_at - started_at)
+
+    def queue_depth(self):
+        """Number of jobs waiting for a worker"""
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self):
+        """Snapshot of load and latency metrics (times in seconds)"""
+        with self._condition:
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queued': sum(len(queue) for queue in self._queues.values()),
+                'sessions_waiting': len(self._order),
+                'completed': self._completed,
+                'speculative_running': self._running_speculative,
+                'speculative_queued': len(self._speculative),
+                'speculative_skipped': self._skipped_speculative,
+                'wait_p50': _percentile(wait_times, 50),
+                'wait_p95': _percentile(wait_times, 95),
+                'wait_max': max(wait_times, default=0.0),
+                'run_p50': _percentile(run_times, 50),
+                'run_p95': _percentile(run_times, 95),
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler, creating it on first use"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                workers = int(os.environ.get('IMG2TAB_OCR_WORKERS', 0)) or None
+                speculative_workers = int(os.environ.get('IMG2TAB_SPECULATIVE_WORKERS', 0)) or None
+                _scheduler = OcrScheduler(workers=workers, speculative_workers=speculative_workers)
+    return _scheduler
+
+
+def image_to_data(image, config='', session_id=None, output_type=None):
+    """pytesseract.image_to_data run through the shared scheduler (dict output by default)"""
+    # pytesseract pulls in pandas when installed, so it is only imported for real OCR work
+    import pytesseract
+    return get_scheduler().run(session_id, pytesseract.image_to_data, image,
+                               config=config, output_type=output_type or pytesseract.Output.DICT)
@@ -0,0 +1,200 @@
+"""
+Stitch overlapping scrolled screenshots of one long table
+
+Each screenshot is OCR'd only below what earlier screenshots already covered:
+
+1. Image-strip fingerprints (one small quantized vector per pixel row) locate
+   the vertical overlap with the previous screenshot, including a frozen
+   header that stays pinned at the top while the body scrolls.
+2. Only the new strip under the overlap is cropped and OCR'd.
+3. Hashed row content drops any rows at the seam that were already captured
+   (rows re-read around the seam, a repeated header), so the table grows by
+   new rows only.
+4. A text line cut by the bottom edge is OCR'd separately and its rows are kept
+   as provisional; once the next screenshot shows that line whole, it is
+   re-read from the blank row above it and replaces them.
+"""
+
+import hashlib
+
+import numpy as np
+from PIL import Image, ImageOps
+
+
+def strip_fingerprints(image, width=128, levels=16):
+    """
+    Fingerprint every pixel row of an image
+
+    The image is squeezed to a fixed width and quantized, so the same content
+    gives the same rows even after minor compression noise.
+
+    Returns:
+        uint8 array of shape (height, width)
+    """
+    gray = ImageOps.autocontrast(image.convert('L'))
+    small = gray.resize((width, gray.height), Image.BILINEAR)
+    return (np.asarray(small, dtype=np.uint8) // (256 // levels)).astype(np.uint8)
+
+
+def _blank_rows(fingerprints):
+    """Rows with no visible content (flat after quantization)"""
+    return (fingerprints.max(axis=1) - fingerprints.min(axis=1)) <= 1
+
+
+def find_overlap(previous, current, min_overlap=8, min_match=0.98):
+    """
+    Find how the top of the current screenshot lines up with the previous one
+
+    Args:
+        previous: Fingerprints of the previous screenshot
+        current: Fingerprints of the new screenshot
+        min_overlap: Smallest overlap (pixel rows) accepted as a real match
+        min_match: Fraction of overlapping rows that must match exactly
+
+    Returns:
+        (sticky, overlap): sticky rows pinned at the top of both screenshots
+        (frozen header), and how many rows below those repeat the bottom of
+        the previous screenshot. The new content starts at sticky + overlap.
+    """
+    height = len(previous)
+
+    # Frozen header: leading rows identical in both screenshots
+    limit = min(height, len(current))
+    same = np.all(previous[:limit] == current[:limit], axis=1)
+    sticky = int(np.argmin(same)) if not same.all() else 0
+
+    # Anchor on the first non-blank row under the header; blank rows match everywhere
+    content = np.flatnonzero(~_blank_rows(current[sticky:]))
+    if not len(content):
+        return sticky, 0
+    anchor = sticky + int(content[0])
+
+    candidates = np.flatnonzero(np.all(previous == current[anchor], axis=1))
+    best = 0
+    for position in candidates:
+        start = int(position) - (anchor - sticky)
+        if start < sticky:
+            continue
+        overlap = height - start
+        if overlap < min_overlap or sticky + overlap > len(current) or overlap <= best:
+            continue
+        matches = np.all(previous[start:] == current[sticky:sticky + overlap], axis=1)
+        if matches.mean() >= min_match:
+            best = overlap
+    return sticky, best
+
+
+def row_hash(row):
+    """Hash a parsed row by its normalized text (case and spacing ignored)"""
+    text = '\x1f'.join(' '.join(cell.split()).lower() for cell in row)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _cut_line_start(fingerprints):
+    """
+    Find a text line cut by the bottom edge of a screenshot
+
+    Returns:
+        None when the bottom pixel row is blank, otherwise the index of the
+        last blank row above the trailing ink run (-1 if there is none)
+    """
+    blank = _blank_rows(fingerprints)
+    if not len(blank) or blank[-1]:
+        return None
+    above = np.flatnonzero(blank)
+    return int(above[-1]) if len(above) else -1
+
+
+def _seam_overlap(existing, new, max_rows):
+    """Length of the longest tail of existing hashes that equals the head of new ones"""
+    for size in range(min(len(existing), len(new), max_rows), 0, -1):
+        if existing[-size:] == new[:size]:
+            return size
+    return 0
+
+
+class ScrollStitcher:
+    """
+    Grow one table from an ordered sequence of overlapping screenshots
+
+    Args:
+        extract_rows: Callable taking a PIL Image and returning parsed rows
+                      (lists of cell strings), e.g. preprocess + OCR + parse
+        has_header: Whether the first screenshot starts with a header row;
+                    a repeated header in later screenshots is dropped
+        max_seam_rows: How many rows around each seam are checked for repeats
+    """
+
+    def __init__(self, extract_rows, has_header=True, max_seam_rows=5):
+        self.extract_rows = extract_rows
+        self.has_header = has_header
+        self.max_seam_rows = max_seam_rows
+        self.rows = []
+        self.row_hashes = []
+        self.total_pixels = 0
+        self.ocr_pixels = 0
+        self._previous = None
+        self._previous_width = None
+        self._previous_cut_start = None
+        self._provisional = 0
+
+    def _read(self, image, top, bottom):
+        """OCR one horizontal strip of a screenshot and return its non-empty rows"""
+        if bottom - top < 2:
+            return []
+        strip = image.crop((0, top, image.width, bottom)) if (top, bottom) != (0, image.height) else image
+        self.ocr_pixels += strip.width * strip.height
+        return [row for row in self.extract_rows(strip) if any(cell.strip() for cell in row)]
+
+    def add(self, image):
+        """
+        OCR the new part of a screenshot and append its new rows
+
+        Returns:
+            Number of rows added to the table (rows replacing a provisional cut
+            line from the previous screenshot included)
+        """
+        fingerprints = strip_fingerprints(image)
+        self.total_pixels += image.width * image.height
+
+        start = 0
+        if self._previous is not None and self._previous_width == image.width:
+            sticky, overlap = find_overlap(self._previous, fingerprints)
+            if overlap:
+                start = sticky + overlap
+                if self._previous_cut_start is not None:
+                    # The previous screenshot ended mid-line: drop what OCR made of
+                    # that line and re-read it whole, from the blank row above it
+                    if self._provisional:
+                        del self.rows[-self._provisional:]
+                        del self.row_hashes[-self._provisional:]
+                    start -= len(self._previous) - self._previous_cut_start
+                    start = max(start, sticky)
+        self._provisional = 0
+
+        cut_start = _cut_line_start(fingerprints)
+        self._previous = fingerprints
+        self._previous_width = image.width
+        self._previous_cut_start = cut_start
+
+        # Read the cut-off bottom line on its own, so its rows can be replaced later
+        split = image.height if cut_start is None else max(cut_start + 1, start)
+        new_rows = self._read(image, start, split)
+        cut_rows = self._read(image, split, image.height)
+        new_rows += cut_rows
+        new_hashes = [row_hash(row) for row in new_rows]
+
+        # A repeated header (no pixel overlap found, or header scrolled with the body)
+        if self.has_header and self.row_hashes and new_hashes and new_hashes[0] == self.row_hashes[0]:
+            new_rows, new_hashes = new_rows[1:], new_hashes[1:]
+
+        skip = _seam_overlap(self.row_hashes, new_hashes, self.max_seam_rows)
+        self.rows.extend(new_rows[skip:])
+        self.row_hashes.extend(new_hashes[skip:])
+        self._provisional = min(len(cut_rows), len(new_rows) - skip)
+        return len(new_rows) - skip
+
+    @property
+    def ocr_fraction(self):
+        """Share of the total screenshot area that was actually OCR'd"""
+        return self.ocr_pixels / self.total_pixels if self.total_pixels else 0.0
@@ -0,0 +1,263 @@
+"""
+Concurrent-session load test for streamlit_app.py
+
+Drives the app headlessly with Streamlit's AppTest: each simulated user is an
+independent AppTest session that "uploads" a synthetic table image and then
+moves preprocessing sliders, which triggers a full rerun (preprocess + OCR +
+parse) every time. The test steps through increasing session counts and
+reports throughput, rerun latency percentiles, CPU and memory use, and the
+concurrency level at which throughput stops improving.
+
+Runs fully offline on one machine; Tesseract must be installed.
+
+Usage:
+    python load_test.py --sessions 1,2,4,8 --reruns 5
+"""
+
+import argparse
+import io
+import os
+import random
+import resource
+import threading
+import time
+from unittest import mock
+
+from PIL import Image, ImageDraw, ImageFont
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from img2tab.scheduler import _percentile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+
+# Slider moves each simulated user cycles through (key, value)
+SLIDER_MOVES = [
+    ("contrast_None", 1.5),
+    ("sharpness_None", 2.0),
+    ("brightness_None", 1.2),
+    ("contrast_None", 1.0),
+]
+
+# The file uploader can't be driven by AppTest, so each session stores its
+# synthetic image in its own session state and the patched uploader returns it
+UPLOAD_STATE_KEY = "_load_test_upload"
+
+
+def make_table_image(rows=12, cols=4, seed=0):
+    """
+    Render a synthetic table screenshot with a header row and numeric columns
+
+    Returns:
+        PNG bytes
+    """
+    rng = random.Random(seed)
+    try:
+        font = ImageFont.load_default(size=20)
+    except TypeError:
+        # Pillow < 10.1 only has the small bitmap font
+        font = ImageFont.load_default()
+
+    cell_width, cell_height = 160, 36
+    image = Image.new("RGB", (cols * cell_width + 20, (rows + 1) * cell_height + 20), "white")
+    draw = ImageDraw.Draw(image)
+
+    header = ["Item"] + [f"Q{i}" for i in range(1, cols)]
+    table = [header] + [
+        [f"Row {r + 1}"] + [f"{rng.randint(0, 99999):,}.{rng.randint(0, 99):02d}" for _ in range(cols - 1)]
+        for r in range(rows)
+    ]
+    for r, row in enumerate(table):
+        for c, value in enumerate(row):
+            draw.text((10 + c * cell_width + 8, 10 + r * cell_height + 8), value, fill="black", font=font)
+        draw.line([(10, 10 + (r + 1) * cell_height), (10 + cols * cell_width, 10 + (r + 1) * cell_height)],
+                  fill="gray")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def check_table_regions(shapes=((12, 4), (5, 2), (30, 6), (12, 8)), seeds=range(3)):
+    """
+    Regression check: every synthetic screenshot holds one table, so
+    "Detect multiple tables" must find exactly one region in it
+
+    Returns:
+        List of (rows, cols, seed, region count) for the images that failed
+    """
+    from img2tab import find_table_regions
+
+    failures = []
+    for rows, cols in shapes:
+        for seed in seeds:
+            image = Image.open(io.BytesIO(make_table_image(rows, cols, seed)))
+            count = len(find_table_regions(image))
+            if count != 1:
+                failures.append((rows, cols, seed, count))
+    return failures
+
+
+def _fake_file_uploader(*args, **kwargs):
+    """Stand-in for st.file_uploader that returns the running session's synthetic upload"""
+    data = st.session_state.get(UPLOAD_STATE_KEY)
+    return io.BytesIO(data) if data is not None else None
+
+
+def _current_rss_mb():
+    """Resident memory of this process in MB (Linux /proc, 0.0 elsewhere)"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _cpu_seconds():
+    """User + system CPU time of this process and its finished children (Tesseract runs)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def simulate_session(session_index, reruns, timeout, latencies, errors, lock):
+    """
+    One simulated user: upload an image, then move a slider per rerun
+
+    Latency of every rerun (including the initial upload run) is appended to
+    latencies; failed reruns are counted in errors.
+    """
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.session_state[UPLOAD_STATE_KEY] = make_table_image(seed=session_index)
+
+    for step in range(reruns + 1):
+        started = time.perf_counter()
+        try:
+            if step == 0:
+                app.run()
+            else:
+                key, value = SLIDER_MOVES[(step - 1) % len(SLIDER_MOVES)]
+                app.slider(key=key).set_value(value).run()
+            failure = app.exception[0].message if app.exception else None
+        except Exception as e:
+            failure = str(e)
+        failed = failure is not None
+        elapsed = time.perf_counter() - started
+
+        with lock:
+            if failed:
+                errors.append(failure)
+            else:
+                latencies.append(elapsed)
+        if failed:
+            break
+
+
+def run_level(sessions, reruns, timeout):
+    """Run one concurrency level and return its measurements"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=simulate_session, args=(i, reruns, timeout, latencies, errors, lock))
+        for i in range(sessions)
+    ]
+
+    cpu_before = _cpu_seconds()
+    peak_rss = _current_rss_mb()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        peak_rss = max(peak_rss, _current_rss_mb())
+        time.sleep(0.1)
+    wall = time.perf_counter() - started
+    cpu = _cpu_seconds() - cpu_before
+
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "cpu_percent": 100 * cpu / wall if wall else 0.0,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def successful_levels(results):
+    """Levels that completed reruns without errors; only these say anything about throughput"""
+    return [r for r in results if not r["errors"] and r["throughput"] > 0]
+
+
+def find_saturation(results, min_gain=0.10):
+    """
+    Return the first session count after which throughput grows by less than min_gain
+
+    Levels with errors or no completed reruns are ignored. None means throughput
+    was still rising at the highest successful level (or no level succeeded).
+    """
+    results = successful_levels(results)
+    for previous, current in zip(results, results[1:]):
+        if current["throughput"] < previous["throughput"] * (1 + min_gain):
+            return previous["sessions"]
+    return None
+
+
+def print_report(results, saturation):
+    print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'rerun/s':>8} "
+          f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'cpu %':>7} {'rss MB':>8}")
+    for r in results:
+        print(f"{r['sessions']:>8} {r['reruns']:>7} {r['errors']:>6} {r['throughput']:>8.2f} "
+              f"{r['p50']:>7.2f} {r['p95']:>7.2f} {r['p99']:>7.2f} {r['cpu_percent']:>7.0f} "
+              f"{r['peak_rss_mb']:>8.0f}")
+    for r in results:
+        if r["first_error"]:
+            print(f"First error at {r['sessions']} session(s): {r['first_error']}")
+    print()
+    if not successful_levels(results):
+        print("No successful reruns - see the errors above; no saturation point can be given.")
+    elif saturation is None:
+        print("Throughput was still rising at the highest session count - try more sessions.")
+    else:
+        print(f"Saturation point: ~{saturation} concurrent sessions "
+              f"(more sessions add latency without adding throughput)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test streamlit_app.py with concurrent headless sessions")
+    parser.add_argument("--sessions", default="1,2,4,8",
+                        help="Comma-separated concurrent session counts to test (default: 1,2,4,8)")
+    parser.add_argument("--reruns", type=int, default=4,
+                        help="Slider moves per session after the initial upload (default: 4)")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="Seconds a single rerun may take before it counts as an error (default: 120)")
+    parser.add_argument("--check-regions", action="store_true",
+                        help="Only check that each synthetic table is detected as one table region, then exit")
+    args = parser.parse_args()
+
+    if args.check_regions:
+        failures = check_table_regions()
+        for rows, cols, seed, count in failures:
+            print(f"{rows}x{cols} table (seed {seed}) split into {count} region(s)")
+        print("Region check failed" if failures else "Region check passed")
+        raise SystemExit(1 if failures else 0)
+
+    levels = [int(level) for level in args.sessions.split(",") if level.strip()]
+    results = []
+    with mock.patch.object(st, "file_uploader", _fake_file_uploader):
+        for sessions in levels:
+            print(f"Running {sessions} concurrent session(s)...")
+            results.append(run_level(sessions, args.reruns, args.timeout))
+
+    print()
+    print_report(results, find_saturation(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,121 +1,28 @@
 import streamlit as st
 import pandas as pd
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
-import pytesseract
+from PIL import Image
 import io
-import re
-import numpy as np
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from img2tab import (
+    OCR_CONFIG, PRESETS, ScrollStitcher, TableSnapshot, build_dataframe, extract_table, find_table_regions,
+    get_scheduler, incremental_update, ocr_with_data, parse_table_data, preprocess_image, process_regions,
+)
+from img2tab import prefetch
 
 st.set_page_config(page_title="Table Screenshot to Excel/CSV", page_icon="📊", layout="wide")
 
-def preprocess_image(image, contrast=1.0, sharpness=1.0, brightness=1.0, denoise=False, binarize=False, threshold=128):
+def get_session_id():
     """
-    Preprocess image to improve OCR accuracy with adjustable levels
-    
-    Args:
-        image: PIL Image object
-        contrast: Contrast level (1.0 = original, >1.0 = more contrast)
-        sharpness: Sharpness level (1.0 = original, >1.0 = sharper)
-        brightness: Brightness level (1.0 = original, >1.0 = brighter)
-        denoise: Boolean to apply noise reduction
-        binarize: Boolean to convert to black & white
-        threshold: Threshold for binarization (0-255)
+    Return the current Streamlit session id, used to queue OCR work fairly between users
     """
-    processed = image.copy()
-    
-    # Convert to RGB if needed
-    if processed.mode != 'L' and processed.mode != 'RGB':
-        processed = processed.convert('RGB')
-    
-    # Denoise first (if enabled)
-    if denoise:
-        processed = processed.filter(ImageFilter.MedianFilter(size=3))
-    
-    # Adjust brightness
-    if brightness != 1.0:
-        enhancer = ImageEnhance.Brightness(processed)
-        processed = enhancer.enhance(brightness)
-    
-    # Enhance contrast
-    if contrast != 1.0:
-        enhancer = ImageEnhance.Contrast(processed)
-        processed = enhancer.enhance(contrast)
-    
-    # Enhance sharpness
-    if sharpness != 1.0:
-        enhancer = ImageEnhance.Sharpness(processed)
-        processed = enhancer.enhance(sharpness)
-    
-    # Apply additional edge enhancement for high sharpness
-    if sharpness > 2.0:
-        processed = processed.filter(ImageFilter.EDGE_ENHANCE)
-    
-    # Binarize (convert to pure black and white)
-    if binarize:
-        processed = processed.convert('L')
-        processed = ImageOps.autocontrast(processed)
-        processed = processed.point(lambda p: 255 if p > threshold else 0)
-    
-    return processed
-
-def parse_table_data(extracted_text, expected_columns=None):
-    """
-    Parse extracted text into table data with optional column hint
-    """
-    lines = extracted_text.strip().split('\n')
-    lines = [line.strip() for line in lines if line.strip()]
-    
-    table_data = []
-    
-    if expected_columns:
-        # Use column count hint for better parsing
-        for line in lines:
-            # Try multiple splitting strategies
-            # Strategy 1: Split by multiple spaces or tabs
-            row = re.split(r'\s{2,}|\t+', line)
-            row = [cell.strip() for cell in row if cell.strip()]
-            
-            # Strategy 2: If we don't have expected columns, try single space split
-            if len(row) != expected_columns:
-                row = line.split()
-                row = [cell.strip() for cell in row if cell.strip()]
-            
-            # Strategy 3: Try to intelligently group tokens
-            if len(row) > expected_columns:
-                # Too many columns - try to merge adjacent tokens
-                new_row = []
-                i = 0
-                while i < len(row) and len(new_row) < expected_columns:
-                    if len(new_row) == expected_columns - 1:
-                        # Last column - join remaining
-                        new_row.append(' '.join(row[i:]))
-                        break
-                    else:
-                        new_row.append(row[i])
-                        i += 1
-                row = new_row
-            elif len(row) < expected_columns and len(row) > 0:
-                # Too few columns - pad with empty strings
-                while len(row) < expected_columns:
-                    row.append('')
-            
-            if row and len(row) == expected_columns:
-                table_data.append(row)
-    else:
-        # Original parsing method without column hint
-        for line in lines:
-            row = re.split(r'\s{2,}|\t+', line)
-            row = [cell.strip() for cell in row if cell.strip()]
-            if row:
-                table_data.append(row)
-    
-    return table_data
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
 
 st.title("📊 Table Screenshot Converter")
 st.markdown("Upload a screenshot of a table, and I'll convert it to CSV or XLSX format")
 
 # Create tabs for different input methods
-tab1, tab2 = st.tabs(["📁 Upload File", "📋 Paste from Clipboard"])
+tab1, tab2, tab3 = st.tabs(["📁 Upload File", "📋 Paste from Clipboard", "🖼️ Scroll Capture"])
 
 uploaded_file = None
 
@@ -141,6 +48,17 @@ with tab2:
     if paste_result.image_data is not None:
         uploaded_file = paste_result.image_data
 
+scroll_files = []
+
+with tab3:
+    st.markdown("**Stitch a long table from several overlapping scrolled screenshots:**")
+    st.markdown("Files are processed in file name order; overlapping rows are only read once")
+    scroll_uploads = st.file_uploader("Choose the screenshots (JPG or PNG)", type=['jpg', 'jpeg', 'png'],
+                                      accept_multiple_files=True, key="scroll_uploads")
+    if scroll_uploads and uploaded_file is None:
+        scroll_files = sorted(scroll_uploads, key=lambda f: f.name)
+        uploaded_file = scroll_files[0]
+
 if uploaded_file is not None:
     # Initialize session state for preset defaults
     if 'preset_active' not in st.session_state:
@@ -158,28 +76,13 @@ if uploaded_file is not None:
     st.sidebar.markdown("Adjust enhancement levels for better OCR results")
     
     # Set default values based on active preset
-    if st.session_state.preset_active == "clear":
-        default_contrast = 1.5
-        default_sharpness = 2.0
-        default_brightness = 1.0
-        default_denoise = False
-        default_binarize = True
-        default_threshold = 128
-    elif st.session_state.preset_active == "low_quality":
-        default_contrast = 2.5
-        default_sharpness = 2.5
-        default_brightness = 1.2
-        default_denoise = True
-        default_binarize = False
-        default_threshold = 128
-    else:
-        # Default values when no preset is active - all neutral
-        default_contrast = 1.0
-        default_sharpness = 1.0
-        default_brightness = 1.0
-        default_denoise = False
-        default_binarize = False
-        default_threshold = 128
+    defaults = PRESETS.get(st.session_state.preset_active, PRESETS[None])
+    default_contrast = defaults['contrast']
+    default_sharpness = defaults['sharpness']
+    default_brightness = defaults['brightness']
+    default_denoise = defaults['denoise']
+    default_binarize = defaults['binarize']
+    default_threshold = defaults['threshold']
     
     # Contrast enhancement slider
     contrast_level = st.sidebar.slider(
@@ -256,6 +159,13 @@ if uploaded_file is not None:
     
     st.sidebar.markdown("---")
     
+    # Second pass over weak numeric cells only
+    refine_numbers = st.sidebar.checkbox(
+        "Re-check low-confidence numbers",
+        value=True,
+        help="Re-reads only the uncertain cells of numeric columns with a digits-only OCR pass"
+    )
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -271,6 +181,7 @@ if uploaded_file is not None:
         else:
             # Direct PIL Image from paste_result
             image = uploaded_file
+        
             
         st.image(image, use_container_width=True)
         
@@ -286,6 +197,29 @@ if uploaded_file is not None:
         if use_column_hint:
             expected_columns = st.number_input("Number of columns", min_value=1, max_value=20, value=3,
                                               help="Enter the expected number of columns in your table")
+        
+        # Dashboards often hold several separate tables
+        detect_multiple = st.checkbox("Detect multiple tables", value=False,
+                                     help="Split the screenshot at blank gutters and extract each table separately")
+        
+        # Repeated screenshots of the same dashboard usually change only a few cells
+        incremental_mode = st.checkbox("Incremental refresh", value=False,
+                                      help="Keep the last result and, for a new screenshot of the same table, "
+                                           "re-read only the rows that changed")
+        
+        current_settings = dict(contrast=contrast_level, sharpness=sharpness_level, brightness=brightness_level,
+                                denoise=denoise, binarize=binarize, threshold=threshold)
+        
+        # Prepare the quick presets in the background before this session's own OCR
+        # is queued; the scheduler keeps a worker free of speculative jobs for it.
+        # Scroll captures and split dashboards never use whole-image results.
+        image_digest = None
+        if not scroll_files:
+            image_digest = prefetch.image_digest(image)
+            if not detect_multiple:
+                prefetch.prefetch(image, image_digest, preprocess_image,
+                                  [settings for settings in PRESETS.values() if settings != current_settings],
+                                  OCR_CONFIG)
     
     with col2:
         st.subheader("Processed Image")
@@ -306,61 +240,126 @@ if uploaded_file is not None:
     st.subheader("Extracted Table")
     
     with st.spinner("Processing image..."):
-        # Extract text using Tesseract OCR on processed image
-        custom_config = r'--oem 3 --psm 6'
-        extracted_text = pytesseract.image_to_string(processed_image, config=custom_config)
+        session_id = get_session_id()
         
-        # Parse the extracted text into a table with optional column hint
-        table_data = parse_table_data(extracted_text, expected_columns)
+        # Split dashboards with several tables into regions and process them concurrently
+        regions = find_table_regions(image) if detect_multiple and not scroll_files else []
         
-        if table_data:
-            # Determine max columns
-            max_cols = max(len(row) for row in table_data)
+        if scroll_files:
+            def extract_rows(strip):
+                # Every rerun re-stitches the same strips, so keep their OCR results like prefetched ones
+                strip_key = prefetch.cache_key(prefetch.image_digest(strip), current_settings, OCR_CONFIG)
+                strip_result = prefetch.take(strip_key)
+                if strip_result is None:
+                    processed_strip = preprocess_image(strip, **current_settings)
+                    strip_result = ocr_with_data(processed_strip, config=OCR_CONFIG, session_id=session_id)
+                    prefetch.remember(strip_key, strip_result)
+                return parse_table_data(strip_result[0], expected_columns)
             
-            # Pad rows to have equal columns
-            for row in table_data:
-                while len(row) < max_cols:
-                    row.append('')
+            # OCR only the part of each screenshot not covered by the previous one
+            stitcher = ScrollStitcher(extract_rows, has_header=has_header)
+            for scroll_file in scroll_files:
+                scroll_file.seek(0)
+                stitcher.add(Image.open(scroll_file))
             
-            # Create DataFrame based on header selection
-            if has_header and len(table_data) > 1:
-                df = pd.DataFrame(table_data[1:], columns=table_data[0])
-            else:
-                # No header - use default column names
-                df = pd.DataFrame(table_data)
-                df.columns = [f'Column_{i+1}' for i in range(len(df.columns))]
+            extracted_text = '\n'.join('  '.join(row) for row in stitcher.rows)
+            tables = [build_dataframe(stitcher.rows, has_header)] if stitcher.rows else []
+            refined_cells = 0
+            st.caption(f"🖼️ Stitched {len(scroll_files)} screenshot(s); "
+                       f"OCR covered {stitcher.ocr_fraction:.0%} of the total image area")
+        elif len(regions) > 1:
+            def process_region(crop):
+                processed_crop = preprocess_image(
+                    crop,
+                    contrast=contrast_level,
+                    sharpness=sharpness_level,
+                    brightness=brightness_level,
+                    denoise=denoise,
+                    binarize=binarize,
+                    threshold=threshold
+                )
+                return extract_table(processed_crop, expected_columns, has_header,
+                                     refine_numbers, session_id)
             
-            # Try to convert numeric columns
-            for col in df.columns:
-                try:
-                    # Remove common numeric separators and convert
-                    df[col] = df[col].str.replace(',', '').str.replace('$', '').str.strip()
-                    df[col] = pd.to_numeric(df[col], errors='ignore')
-                except:
-                    pass
+            results = process_regions(image, regions, process_region)
+            extracted_text = '\n\n'.join(text for text, _, _, _ in results)
+            tables = [df for _, _, df, _ in results if df is not None]
+            refined_cells = sum(count for _, _, _, count in results)
+        else:
+            snapshot_settings = dict(current_settings, expected_columns=expected_columns, has_header=has_header,
+                                     refine_numbers=refine_numbers)
             
-            st.dataframe(df, use_container_width=True)
+            # Re-read only the rows that changed since the previous screenshot
+            incremental_result = None
+            snapshot = st.session_state.get('table_snapshot')
+            if incremental_mode and snapshot is not None:
+                incremental_result = incremental_update(
+                    snapshot, image, processed_image,
+                    lambda text: parse_table_data(text, expected_columns),
+                    snapshot_settings, session_id
+                )
+            
+            if incremental_result is not None:
+                table_data, changed_rows = incremental_result
+                snapshot.advance(image, table_data)
+                extracted_text = '\n'.join('  '.join(row) for row in table_data)
+                tables = [build_dataframe(table_data, has_header)]
+                refined_cells = 0
+                st.caption(f"♻️ Incremental refresh: re-read {len(changed_rows)} of {len(table_data)} row(s)")
+            else:
+                # Reuse a speculative result for these exact settings if one is ready
+                ocr_key = prefetch.cache_key(image_digest, current_settings, OCR_CONFIG)
+                ocr_result = prefetch.take(ocr_key)
+                if ocr_result is None:
+                    ocr_result = ocr_with_data(processed_image, config=OCR_CONFIG, session_id=session_id)
+                    prefetch.remember(ocr_key, ocr_result)
+                
+                extracted_text, table_data, df, refined_cells = extract_table(
+                    processed_image, expected_columns, has_header, refine_numbers, session_id,
+                    ocr_result=ocr_result
+                )
+                tables = [df] if df is not None else []
+                
+                if incremental_mode and table_data:
+                    # Row spans must come from the rows as OCR'd, before numeric cells were corrected
+                    st.session_state.table_snapshot = TableSnapshot(
+                        image, table_data, ocr_result[1], snapshot_settings,
+                        ocr_rows=parse_table_data(ocr_result[0], expected_columns)
+                    )
+
+        
+        if tables:
+            for i, df in enumerate(tables):
+                if len(tables) > 1:
+                    st.markdown(f"**Table {i+1}**")
+                st.dataframe(df, use_container_width=True)
+            if refined_cells:
+                st.caption(f"🔢 Re-checked and corrected {refined_cells} low-confidence numeric cell(s)")
             
             st.subheader("Download Options")
             
             col_a, col_b = st.columns(2)
             
-            # CSV download
+            # CSV download (one file per table)
             with col_a:
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download as CSV",
-                    data=csv,
-                    file_name="table_data.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+                for i, df in enumerate(tables):
+                    csv = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV" if len(tables) == 1 else f"📥 Download Table {i+1} as CSV",
+                        data=csv,
+                        file_name="table_data.csv" if len(tables) == 1 else f"table_{i+1}.csv",
+                        mime="text/csv",
+                        use_container_width=True,
+                        key=f"csv_download_{i}"
+                    )
             
-            # Excel download
+            # Excel download (one sheet per table)
             with col_b:
                 buffer = io.BytesIO()
                 with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Data')
+                    for i, df in enumerate(tables):
+                        sheet_name = 'Data' if len(tables) == 1 else f'Table_{i+1}'
+                        df.to_excel(writer, index=False, sheet_name=sheet_name)
                 
                 st.download_button(
                     label="📥 Download as XLSX",
@@ -370,12 +369,26 @@ if uploaded_file is not None:
                     use_container_width=True
                 )
             
-            st.success("✅ Table extracted successfully!")
+            if len(tables) > 1:
+                st.success(f"✅ {len(tables)} tables extracted successfully!")
+            else:
+                st.success("✅ Table extracted successfully!")
         else:
             st.error("❌ Could not extract table data. Please ensure the image contains a clear table.")
     
     with st.expander("📝 Raw Extracted Text"):
         st.text(extracted_text)
+    
+    with st.expander("⚙️ OCR Server Load"):
+        ocr_stats = get_scheduler().stats()
+        st.markdown(
+            f"- **Workers busy:** {ocr_stats['running']} / {ocr_stats['workers']}\n"
+            f"- **Jobs queued:** {ocr_stats['queued']} (from {ocr_stats['sessions_waiting']} session(s))\n"
+            f"- **Queue wait:** p50 {ocr_stats['wait_p50']:.2f}s, p95 {ocr_stats['wait_p95']:.2f}s\n"
+            f"- **OCR run time:** p50 {ocr_stats['run_p50']:.2f}s, p95 {ocr_stats['run_p95']:.2f}s\n"
+            f"- **Preset prefetch:** {ocr_stats['speculative_running']} running, "
+            f"{ocr_stats['speculative_queued']} queued, {ocr_stats['speculative_skipped']} skipped under load"
+        )
 
 st.markdown("---")
 st.markdown("**💡 Tips for best results:**")
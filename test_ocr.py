@@ -4,9 +4,7 @@ This can be used to test the core functionality without running Streamlit
 """
 
 from PIL import Image
-import pytesseract
-import pandas as pd
-import re
+from img2tab import build_dataframe, ocr_with_data, parse_table_data
 
 def extract_table_from_image(image_path):
     """Extract table data from an image file"""
@@ -15,52 +13,21 @@ def extract_table_from_image(image_path):
     image = Image.open(image_path)
     
     # Extract text using Tesseract
-    custom_config = r'--oem 3 --psm 6'
-    extracted_text = pytesseract.image_to_string(image, config=custom_config)
+    extracted_text, _ = ocr_with_data(image)
     
     print("Raw extracted text:")
     print(extracted_text)
     print("\n" + "="*50 + "\n")
     
     # Parse text into table
-    lines = extracted_text.strip().split('\n')
-    lines = [line.strip() for line in lines if line.strip()]
-    
-    table_data = []
-    for line in lines:
-        # Split by multiple spaces or tabs
-        row = re.split(r'\s{2,}|\t+', line)
-        row = [cell.strip() for cell in row if cell.strip()]
-        if row:
-            table_data.append(row)
+    table_data = parse_table_data(extracted_text)
     
     if not table_data:
         print("No table data found!")
         return None
     
-    # Determine max columns
-    max_cols = max(len(row) for row in table_data)
-    
-    # Pad rows
-    for row in table_data:
-        while len(row) < max_cols:
-            row.append('')
-    
-    # Create DataFrame
-    if len(table_data) > 1:
-        df = pd.DataFrame(table_data[1:], columns=table_data[0])
-    else:
-        df = pd.DataFrame(table_data)
-    
-    # Convert numeric columns
-    for col in df.columns:
-        try:
-            df[col] = df[col].str.replace(',', '').str.replace('$', '').str.strip()
-            df[col] = pd.to_numeric(df[col], errors='ignore')
-        except:
-            pass
-    
-    return df
+    # Pad rows, use the first row as header and convert numeric columns
+    return build_dataframe(table_data, has_header=True)
 
 if __name__ == "__main__":
     # Test with your image
@@ -0,0 +1,301 @@
+"""
+Watch a directory and convert every new table screenshot to CSV/XLSX
+
+Long-running ingestion mode built on test_ocr.extract_table_from_image:
+
+- A persistent manifest (append-only JSON lines in the output directory)
+  records every file seen with its size, mtime and content hash. Rescans only
+  stat files, so an already-processed directory of 100k images is skipped
+  in seconds; files are hashed only when new or changed, and content already
+  converted under another name is recorded as a duplicate, not re-OCR'd.
+- New files go to a bounded process pool; at most workers x 2 jobs are in
+  flight, so a large backlog does not pile up in memory.
+- Outputs are written to a temp file and renamed into place, and a file is
+  marked done in the manifest only after its output exists. After a crash,
+  anything not marked done is simply processed again on the next scan.
+
+Usage:
+    python watch_folder.py screenshots/ tables/ --workers 4 --interval 5
+    python watch_folder.py screenshots/ tables/ --once
+"""
+
+import argparse
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import hashlib
+import io
+import json
+import os
+import time
+
+# One Tesseract thread and one OCR scheduler worker per process; the pool size decides CPU use
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+os.environ['IMG2TAB_OCR_WORKERS'] = '1'
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+MANIFEST_NAME = '.manifest.jsonl'
+# Worker crashes (e.g. out of memory) a file may cause before it is marked failed
+MAX_CRASHES = 3
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    """Call write(temp_path), then rename the temp file over path"""
+    # Keep the real extension last: writers such as to_excel pick their format from it
+    root, extension = os.path.splitext(path)
+    temp_path = f"{root}.{os.getpid()}.tmp{extension}"
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class Manifest:
+    """
+    Persistent record of processed files, keyed by path and by content hash
+
+    Stored as append-only JSON lines; the last record for a path wins. A torn
+    final line from a crash is ignored on load. Paths are absolute, so the same
+    directory given as "in" or "in/" maps to the same records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.by_path = {}
+        self.by_hash = {}
+        line_count = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line_count += 1
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._index(record)
+        # Drop superseded records so the file doesn't grow without bound
+        if line_count > 2 * len(self.by_path) + 1000:
+            self.compact()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _index(self, record):
+        for key in ('path', 'output'):
+            if key in record and not os.path.isabs(record[key]):
+                record[key] = os.path.abspath(record[key])
+        self.by_path[record['path']] = record
+        if record.get('status') == 'done':
+            self.by_hash.setdefault(record['sha256'], record)
+
+    def is_current(self, path, stat):
+        """True if path was already handled and has not changed since (a crash is retried)"""
+        record = self.by_path.get(path)
+        return (record is not None
+                and record.get('status') != 'crashed'
+                and record['size'] == stat.st_size
+                and record['mtime_ns'] == stat.st_mtime_ns)
+
+    def add(self, record):
+        """Append a record and flush it to disk before returning"""
+        self._index(record)
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def compact(self):
+        """Rewrite the manifest with only the latest record per path"""
+        def write(temp_path):
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in self.by_path.values():
+                    f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        _atomic_write(self.path, write)
+
+    def close(self):
+        self._file.close()
+
+
+def convert_file(image_path, output_path, output_format='csv'):
+    """
+    Worker job: extract the table from one image and write it atomically
+
+    Returns:
+        'done' if a table was written, 'empty' if no table was found
+    """
+    from test_ocr import extract_table_from_image
+
+    # extract_table_from_image prints the raw OCR text; keep worker logs quiet
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = extract_table_from_image(image_path)
+    except Exception as e:
+        # Some library exceptions can't be unpickled in the parent and would
+        # break the whole pool, so only the message crosses the process boundary
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    if df is None:
+        return 'empty'
+
+    if output_format == 'xlsx':
+        _atomic_write(output_path, lambda temp_path: df.to_excel(temp_path, index=False, engine='openpyxl'))
+    else:
+        _atomic_write(output_path, lambda temp_path: df.to_csv(temp_path, index=False))
+    return 'done'
+
+
+def scan(input_dir, manifest, settle_seconds=2.0):
+    """
+    List image files that are new or changed since the manifest last saw them
+
+    Files modified within settle_seconds are skipped until the next scan, since
+    they may still be being written.
+    """
+    now = time.time()
+    pending = []
+    with os.scandir(os.path.abspath(input_dir)) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if manifest.is_current(entry.path, stat) or now - stat.st_mtime < settle_seconds:
+                continue
+            pending.append((entry.path, stat))
+    pending.sort()
+    return pending
+
+
+def ingest(input_dir, output_dir, manifest, executor, max_in_flight, output_format='csv'):
+    """
+    Process one scan's worth of new files through the worker pool
+
+    Returns:
+        Number of files converted in this pass
+    """
+    converted = 0
+    in_flight = {}
+    # Content hashes of jobs submitted in this pass
+    submitted = set()
+
+    def collect(futures):
+        nonlocal converted
+        for future in futures:
+            record = in_flight.pop(future)
+            try:
+                record['status'] = future.result()
+            except BrokenProcessPool:
+                # A worker died; any file in flight may be the cause. Suspects are
+                # retried alone, so a file that keeps crashing is the one that fails
+                record['crashes'] = record.get('crashes', 0) + 1
+                if record['crashes'] >= MAX_CRASHES:
+                    record['status'] = 'failed'
+                    record['error'] = f"worker crashed {record['crashes']} times"
+                    print(f"Failed: {record['path']}: {record['error']}")
+                else:
+                    record['status'] = 'crashed'
+            except Exception as e:
+                record['status'] = 'failed'
+                record['error'] = str(e)
+                print(f"Failed: {record['path']}: {e}")
+            if record['status'] == 'done':
+                converted += 1
+            manifest.add(record)
+
+    for path, stat in scan(input_dir, manifest):
+        sha256 = file_hash(path)
+        record = {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+
+        original = manifest.by_hash.get(sha256)
+        if original is not None and os.path.exists(original['output']):
+            manifest.add(dict(record, status='duplicate', output=original['output']))
+            continue
+        if sha256 in submitted:
+            # Recorded as a duplicate on a later scan, once the original is done
+            continue
+
+        # Keep the image extension so a.png and a.jpg don't write the same output
+        record['output'] = os.path.join(os.path.abspath(output_dir), f"{os.path.basename(path)}.{output_format}")
+
+        previous = manifest.by_path.get(path)
+        if previous is not None and previous.get('status') == 'crashed' and previous['sha256'] == sha256:
+            record['crashes'] = previous['crashes']
+        # A file that crashed a worker before runs with nothing else in flight
+        suspect = 'crashes' in record
+
+        if len(in_flight) >= max_in_flight or (suspect and in_flight):
+            done, _ = wait(in_flight, return_when=ALL_COMPLETED if suspect else FIRST_COMPLETED)
+            collect(done)
+        try:
+            future = executor.submit(convert_file, path, record['output'], output_format)
+        except BrokenProcessPool:
+            # Record the crash against whatever was running before the pool is restarted
+            collect(list(in_flight))
+            raise
+        in_flight[future] = record
+        submitted.add(sha256)
+        if suspect:
+            wait(in_flight)
+            collect(list(in_flight))
+
+    if in_flight:
+        done, _ = wait(in_flight)
+        collect(done)
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and convert table screenshots to CSV/XLSX")
+    parser.add_argument("input_dir", help="Directory where screenshots are dropped")
+    parser.add_argument("output_dir", help="Directory for converted tables and the manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of OCR worker processes (default: number of CPUs)")
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="Seconds between directory scans (default: 5)")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv",
+                        help="Output format (default: csv)")
+    parser.add_argument("--once", action="store_true",
+                        help="Process the current contents once and exit")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = Manifest(os.path.join(args.output_dir, MANIFEST_NAME))
+    print(f"Watching {args.input_dir} ({len(manifest.by_path)} file(s) already in manifest)")
+
+    executor = ProcessPoolExecutor(max_workers=args.workers)
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                converted = ingest(args.input_dir, args.output_dir, manifest, executor,
+                                   max_in_flight=args.workers * 2, output_format=args.format)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); crashed files are retried next scan
+                print("Worker pool crashed, restarting it")
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=args.workers)
+                converted = 0
+            if converted:
+                print(f"Converted {converted} file(s) in {time.perf_counter() - started:.1f}s")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("Stopped")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        manifest.close()
+
+
+if __name__ == "__main__":
+    main()